@@ -0,0 +1,178 @@
+"""Headless match engine: advances a batch of matches one second at a time with NumPy.
+
+The engine plays the dashboard's events with the same odds and points
+(bludger hits, quaffle goals, snitch catches), its price model and its
+seeker AI, without any Streamlit. Its timing is simplified, so sweep
+results describe this model rather than exactly what viewers see:
+
+* Prices and the pitch move exactly every PRICE_INTERVAL ticks. The
+  dashboard moves them only on ticks that land in the first half second
+  of a wall-clock five-second window (time.time() % 5 < 0.5), which is
+  irregular and less often.
+* The snitch appears at the first pitch update after SNITCH_APPEARS ticks
+  and is caught at most once per match. On the dashboard it reappears at
+  the next pitch update after a catch and can be caught again.
+* A match lasts MATCH_SECONDS ticks. The dashboard counts wall-clock time,
+  so slow reruns stretch its ticks, and it plays on until Stop Match.
+
+Each tick draws the same amount of randomness whatever the parameters
+are. Two engines with the same seed therefore share their random numbers,
+which is what the scenario sweeps rely on.
+"""
+import numpy as np
+
+from game_state import (
+    BLUDGER_PROB, CATCH_PROB, CATCH_RADIUS, HOUSES, HOUSE_INDEX, HOUSE_NAMES, MATCH_SECONDS,
+    N_BLUDGERS, QUAFFLE_PROB, SNITCH_APPEARS, SNITCH_BONUS
+)
+from seeker_ai import motion_params, snitch_distances, step_bludgers, step_seekers, step_snitch
+
+PRICE_INTERVAL = 5      # Seconds between market and pitch updates
+QUAFFLE_POINTS = 10
+
+DEFAULT_PARAMS = {
+    "bludger_prob": BLUDGER_PROB,
+    "quaffle_prob": QUAFFLE_PROB,
+    "snitch_bonus": SNITCH_BONUS,
+    **{f"volatility_{house}": HOUSES[house]["volatility"] for house in HOUSE_NAMES},
+}
+INTEGER_PARAMS = {"snitch_bonus"}   # Played as whole points
+
+
+def match_params(overrides=None):
+    """Default tunables with overrides applied; unknown names are rejected, integer ones rounded"""
+    overrides = dict(overrides or {})
+    unknown = set(overrides) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise KeyError(f"Unknown match parameters: {', '.join(sorted(unknown))}")
+    params = {**DEFAULT_PARAMS, **overrides}
+    for name in INTEGER_PARAMS:
+        params[name] = int(round(params[name]))
+    return params
+
+
+def step_prices(prices, volatility, rng):
+    """Next house prices from the last ones, shaped (..., houses)"""
+    change = volatility * rng.uniform(-0.1, 0.1, size=prices.shape)
+
+    # House-specific behaviors
+    slytherin, hufflepuff = HOUSE_INDEX["Slytherin"], HOUSE_INDEX["Hufflepuff"]
+    manipulate = rng.random(prices.shape[:-1]) < 0.1  # Slytherin sometimes manipulates the market
+    change[..., slytherin] = np.where(manipulate, np.abs(change[..., slytherin]), change[..., slytherin])
+    change[..., hufflepuff] *= 0.8  # More stable
+
+    return np.maximum(50, prices * (1 + change)).round(2)
+
+
+class MatchEngine:
+    """A batch of independent matches sharing one set of tunables"""
+    __slots__ = (
+        'params', 'n_matches', 'generation', 'tick', 'scores', 'prices', 'positions', 'velocities',
+        'bludgers', 'snitch', 'snitch_active', 'caught', '_volatility', '_motion',
+        '_event_rng', '_move_rng'
+    )
+
+    def __init__(self, n_matches=1, params=None, seed=None):
+        self.params = match_params(params)
+        self.n_matches = n_matches
+        self.generation = -1
+        self._volatility = np.array([self.params[f"volatility_{house}"] for house in HOUSE_NAMES])
+        self._motion = motion_params()
+        # Separate streams so movement noise stays aligned across parameter changes
+        event_seed, move_seed = np.random.SeedSequence(seed).spawn(2)
+        self._event_rng = np.random.default_rng(event_seed)
+        self._move_rng = np.random.default_rng(move_seed)
+        self.reset()
+
+    def reset(self):
+        """Start a fresh generation of matches; random streams carry on where they were"""
+        self.generation += 1
+        self.tick = 0
+        m, n_houses = self.n_matches, len(HOUSE_NAMES)
+        # New arrays rather than in-place fills: published ticks may still reference the old ones
+        self.scores = np.full((m, n_houses), 10, dtype=np.int64)
+        self.prices = np.full((m, n_houses), 100, dtype=np.float64)
+        self.positions = np.zeros((m, n_houses, 2))
+        self.velocities = np.zeros((m, n_houses, 2))
+        self.bludgers = np.tile(np.array([[-0.75, 0.75], [0.75, -0.75]])[:N_BLUDGERS], (m, 1, 1))
+        self.snitch = np.zeros((m, 2))
+        self.snitch_active = np.zeros(m, dtype=bool)
+        self.caught = np.zeros(m, dtype=bool)
+
+    def step(self):
+        """Advance every match one second and return the tick's output"""
+        self.tick += 1
+        m, n_houses = self.scores.shape
+        rows = np.arange(m)
+        rng = self._event_rng
+
+        # One fixed-shape draw per tick keeps random numbers common across parameters
+        draws = rng.random((m, 5 + n_houses))
+        u = draws[:, :2]
+        houses = (draws[:, 2:4] * n_houses).astype(np.intp)
+        damage = 1 + (draws[:, 4] * 5).astype(np.intp)
+        catch_u = draws[:, 5:]
+
+        # Bludger attacks
+        bludger = u[:, 0] < self.params["bludger_prob"]
+        hit = rows[bludger], houses[bludger, 0]
+        self.scores[hit] = np.maximum(0, self.scores[hit] - damage[bludger])
+
+        # Quaffle goals
+        quaffle = u[:, 1] < self.params["quaffle_prob"]
+        self.scores[rows[quaffle], houses[quaffle, 1]] += QUAFFLE_POINTS
+
+        # Snitch catch: first house in order that is close enough and lucky
+        catcher = np.full(m, -1)
+        if self.snitch_active.any():
+            eligible = (self.snitch_active[:, None]
+                        & (snitch_distances(self.positions, self.snitch) < CATCH_RADIUS)
+                        & (catch_u < CATCH_PROB))
+            catch = eligible.any(axis=1)
+            catcher[catch] = eligible.argmax(axis=1)[catch]
+            self.scores[rows[catch], catcher[catch]] += self.params["snitch_bonus"]
+            self.snitch_active &= ~catch
+            self.caught |= catch
+
+        price_tick = self.tick % PRICE_INTERVAL == 0
+        if price_tick:
+            self.prices = step_prices(self.prices, self._volatility, rng)
+            self._move()
+
+        return {
+            "generation": self.generation,
+            "tick": self.tick,
+            "price_tick": price_tick,
+            "prices": self.prices,
+            "scores": self.scores,
+            "bludger_house": np.where(bludger, houses[:, 0], -1),
+            "bludger_damage": np.where(bludger, damage, 0),
+            "quaffle_house": np.where(quaffle, houses[:, 1], -1),
+            "catch_house": catcher,
+        }
+
+    def _move(self):
+        rng = self._move_rng
+        step_seekers(self.positions, self.velocities, self._motion,
+                     self.snitch, self.snitch_active, self.bludgers, rng)
+        step_bludgers(self.bludgers, self.positions, rng)
+        step_snitch(self.snitch, self.positions, rng)
+
+        appear_at = rng.uniform(-1, 1, size=self.snitch.shape)
+        # Unlike the dashboard, a caught snitch stays caught for the rest of the match
+        appear = ~self.snitch_active & ~self.caught & (self.tick > SNITCH_APPEARS)
+        self.snitch[appear] = appear_at[appear]
+        self.snitch_active |= appear
+
+
+def simulate_matches(n_matches, params=None, seed=None, seconds=MATCH_SECONDS):
+    """Play full matches; returns final scores, price paths (ticks, matches, houses) and catchers"""
+    engine = MatchEngine(n_matches, params, seed)
+    prices = [engine.prices.copy()]
+    catchers = np.full(n_matches, -1)
+    for _ in range(seconds):
+        out = engine.step()
+        if out["price_tick"]:
+            prices.append(out["prices"].copy())
+        catchers = np.where(out["catch_house"] >= 0, out["catch_house"], catchers)
+    return {"scores": engine.scores, "prices": np.stack(prices), "catcher": catchers}
@@ -0,0 +1,230 @@
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+HOUSES = {
+    "Gryffindor": {
+        "color": "#AE0001",
+        "volatility": 0.3,
+        "mascot": "🦁",
+        "traits": "Bravery, Nerve, Courage"
+    },
+    "Slytherin": {
+        "color": "#2A623D",
+        "volatility": 0.4,
+        "mascot": "🐍",
+        "traits": "Ambition, Cunning, Resourcefulness"
+    },
+    "Ravenclaw": {
+        "color": "#0E1A40",
+        "volatility": 0.25,
+        "mascot": "🦅",
+        "traits": "Intelligence, Wisdom, Creativity"
+    },
+    "Hufflepuff": {
+        "color": "#FFDB00",
+        "volatility": 0.2,
+        "mascot": "🦡",
+        "traits": "Loyalty, Patience, Fair Play"
+    }
+}
+
+HOUSE_NAMES = list(HOUSES)
+HOUSE_INDEX = {house: i for i, house in enumerate(HOUSE_NAMES)}
+
+# Match tunables (sweep.py runs scenarios over these)
+BLUDGER_PROB = 0.15           # Chance per tick of a bludger hit
+QUAFFLE_PROB = 0.2            # Chance per tick of a quaffle goal
+SNITCH_BONUS = 150
+SNITCH_APPEARS = 120          # Seconds into the match
+CATCH_RADIUS = 0.2
+CATCH_PROB = 0.3              # Chance per tick to catch when within CATCH_RADIUS
+MATCH_SECONDS = 180
+
+N_BLUDGERS = 2
+PRICE_WINDOW = 50             # Price ticks kept per house
+MAX_EVENTS = 200              # Match events kept per session
+SESSION_BUDGET_BYTES = 64 * 1024
+IDLE_TIMEOUT = 10 * 60        # Seconds before an idle session is spilled to disk
+EVICT_TIMEOUT = 60 * 60       # Seconds before a spilled session is dropped
+
+
+class GameState:
+    """Fixed-size game state for one viewer session"""
+    __slots__ = (
+        'active', 'scores', 'prices', 'price_count', 'positions', 'velocities',
+        'bludgers', 'snitch', 'snitch_position', 'start_time', 'events', 'events_bytes'
+    )
+
+    def __init__(self):
+        self.active = False
+        self.scores = np.full(len(HOUSE_NAMES), 10, dtype=np.int32)
+        self.prices = np.zeros((PRICE_WINDOW, len(HOUSE_NAMES)), dtype=np.float64)
+        self.prices[0] = 100
+        self.price_count = 1
+        self.positions = np.zeros((len(HOUSE_NAMES), 2), dtype=np.float64)
+        self.velocities = np.zeros((len(HOUSE_NAMES), 2), dtype=np.float64)
+        self.bludgers = np.array([[-0.75, 0.75], [0.75, -0.75]], dtype=np.float64)[:N_BLUDGERS]
+        self.snitch = False
+        self.snitch_position = np.zeros(2, dtype=np.float64)
+        self.start_time = None
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.events_bytes = 0
+
+    def push_prices(self, row):
+        """Append one tick of house prices, dropping the oldest once the window is full"""
+        if self.price_count == PRICE_WINDOW:
+            self.prices[:-1] = self.prices[1:]
+            self.prices[-1] = row
+        else:
+            self.prices[self.price_count] = row
+            self.price_count += 1
+
+    def price_history(self):
+        """Price ticks in chronological order, one column per house"""
+        return self.prices[:self.price_count]
+
+    def last_prices(self):
+        return self.prices[self.price_count - 1]
+
+    def log_events(self, *events):
+        """Append match events, keeping the running size of the event log"""
+        for event in events:
+            if len(self.events) == self.events.maxlen:
+                self.events_bytes -= sys.getsizeof(self.events[0])
+            self.events.append(event)
+            self.events_bytes += sys.getsizeof(event)
+
+    def drop_oldest_event(self):
+        self.events_bytes -= sys.getsizeof(self.events.popleft())
+
+    def clear_events(self):
+        self.events.clear()
+        self.events_bytes = 0
+
+    def nbytes(self):
+        """Measured memory held by this session's state (never walks the event log)"""
+        size = sys.getsizeof(self)
+        size += self.scores.nbytes + self.prices.nbytes
+        size += self.positions.nbytes + self.velocities.nbytes
+        size += self.bludgers.nbytes + self.snitch_position.nbytes
+        size += sys.getsizeof(self.events) + self.events_bytes
+        return size
+
+
+class SessionStore:
+    """Shared registry of session states with a per-session memory budget and idle spill"""
+
+    def __init__(self, budget_bytes=SESSION_BUDGET_BYTES, idle_timeout=IDLE_TIMEOUT,
+                 evict_timeout=EVICT_TIMEOUT, spill_dir=None):
+        self.budget_bytes = budget_bytes
+        self.idle_timeout = idle_timeout
+        self.evict_timeout = evict_timeout
+        # Without a spill_dir the store owns a temporary one, removed by close(), on
+        # garbage collection (e.g. st.cache_resource.clear()) or at interpreter exit
+        self._tmp_dir = None if spill_dir else tempfile.TemporaryDirectory(prefix="quidditch_sessions_")
+        self.spill_dir = spill_dir or self._tmp_dir.name
+        self._live = {}       # session key -> GameState
+        self._spilled = {}    # session key -> spill file path
+        self._last_seen = {}  # session key -> last access time
+        self._last_tick = {}  # session key -> last simulation tick time
+        self._sizes = {}      # session key -> size last measured by its owner
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the session's state, restoring it from disk if it was spilled"""
+        with self._lock:
+            self._last_seen[key] = time.monotonic()
+            state = self._live.get(key)
+            if state is None:
+                path = self._spilled.pop(key, None)
+                if path is not None and os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        state = pickle.load(f)
+                    os.remove(path)
+                else:
+                    state = GameState()
+                self._live[key] = state
+            return state
+
+    def claim_tick(self, key, interval):
+        """True if the caller should advance this state's simulation; at most once per interval"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_tick.get(key, float('-inf')) < interval:
+                return False
+            self._last_tick[key] = now
+            return True
+
+    # A shared session has one writer per viewer thread, so every change to an
+    # event log goes through the store lock (the same lock spilling pickles under)
+
+    def log_events(self, state, *events):
+        with self._lock:
+            state.log_events(*events)
+
+    def clear_events(self, state):
+        with self._lock:
+            state.clear_events()
+
+    def events(self, state):
+        """Snapshot of the session's event log, oldest first"""
+        with self._lock:
+            return list(state.events)
+
+    def enforce_budget(self, key, state):
+        """Drop the oldest events until the session's state fits the budget; returns its size"""
+        with self._lock:
+            while state.nbytes() > self.budget_bytes and state.events:
+                state.drop_oldest_event()
+            size = state.nbytes()
+            if key in self._live:
+                self._sizes[key] = size
+        return size
+
+    def sweep(self, now=None):
+        """Spill idle sessions to disk and drop long-idle spilled sessions"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for key, last_seen in list(self._last_seen.items()):
+                idle = now - last_seen
+                if key in self._live and idle > self.idle_timeout:
+                    path = os.path.join(self.spill_dir, f"{key}.pkl")
+                    with open(path, 'wb') as f:
+                        pickle.dump(self._live.pop(key), f, protocol=pickle.HIGHEST_PROTOCOL)
+                    self._spilled[key] = path
+                    self._sizes.pop(key, None)
+                elif key in self._spilled and idle > self.evict_timeout:
+                    path = self._spilled.pop(key)
+                    if os.path.exists(path):
+                        os.remove(path)
+                    del self._last_seen[key]
+                    self._last_tick.pop(key, None)
+
+    def close(self):
+        """Delete every spilled session and the store's own spill directory"""
+        with self._lock:
+            for path in self._spilled.values():
+                if os.path.exists(path):
+                    os.remove(path)
+            self._spilled.clear()
+            if self._tmp_dir is not None:
+                self._tmp_dir.cleanup()
+
+    def report(self):
+        """Memory summary from the sizes each session last recorded in enforce_budget"""
+        with self._lock:
+            sizes = list(self._sizes.values())
+            return {
+                'live_sessions': len(self._live),
+                'spilled_sessions': len(self._spilled),
+                'live_bytes': sum(sizes),
+                'max_session_bytes': max(sizes, default=0),
+                'budget_bytes': self.budget_bytes,
+            }
@@ -0,0 +1,174 @@
+"""Headless load test: drive the dashboard with N simulated viewer sessions.
+
+Each viewer is a Streamlit AppTest session running in its own thread, the
+same way the Streamlit server runs one script thread per browser tab. The
+app's own st.rerun() loop is switched off (QUIDDITCH_AUTO_RERUN=0) and the
+harness reruns every session itself once per tick, so latency and cadence
+can be measured. Everything runs offline in this process.
+
+    python load_test.py --sessions 1 5 10 25 --duration 20 --config both --csv report.csv
+"""
+import argparse
+import ctypes
+import gc
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trading_simulation.py")
+CONFIGS = {"per-session": "0", "shared": "1"}
+
+
+def _rss_bytes():
+    """Resident set size after a full collection, or None where /proc is unavailable"""
+    gc.collect()
+    try:
+        # Hand freed heap pages back to the OS so RSS reflects live memory (glibc only)
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else float("nan")
+
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def _open(at, start):
+    """Load the app for one viewer and optionally press Start Match"""
+    at.run()
+    _check(at)
+    if start and not at.sidebar.button[0].disabled:
+        # AppTest applies a click on the next run, so run now to start the match before timing
+        at.sidebar.button[0].click().run()
+        _check(at)
+
+
+def _viewer(at, stop_at, tick_seconds, latencies, starts):
+    """One simulated viewer: rerun once per tick until stop_at"""
+    while time.perf_counter() < stop_at:
+        t0 = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - t0)
+        starts.append(t0)
+        _check(at)
+        time.sleep(tick_seconds)
+
+
+def run_level(config, n_sessions, duration, tick_seconds, timeout):
+    """Run n_sessions viewers for duration seconds under one engine configuration"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    os.environ["QUIDDITCH_SHARED_ENGINE"] = CONFIGS[config]
+
+    # A throwaway viewer pays the interpreter and import warm-up outside the measurement
+    warm_up = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    _open(warm_up, start=True)
+    del warm_up
+    st.cache_resource.clear()  # Fresh SessionStore per level
+    rss_before = _rss_bytes()
+
+    sessions = [AppTest.from_file(APP_PATH, default_timeout=timeout) for _ in range(n_sessions)]
+    latencies = [[] for _ in sessions]
+    starts = [[] for _ in sessions]
+    # Open viewers one by one; concurrent first compiles can trip CPython 3.11's AST parser
+    for i, at in enumerate(sessions):
+        # In shared mode only the first viewer starts the match
+        _open(at, config == "per-session" or i == 0)
+
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+    stop_at = wall_before + duration
+    with ThreadPoolExecutor(max_workers=n_sessions) as pool:
+        futures = [
+            pool.submit(_viewer, at, stop_at, tick_seconds, latencies[i], starts[i])
+            for i, at in enumerate(sessions)
+        ]
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - wall_before
+    cpu = time.process_time() - cpu_before
+    rss_after = _rss_bytes()
+
+    # Measured state size as reported by the app's shared SessionStore
+    state_bytes = sessions[0].session_state["memory_report"]["live_bytes"]
+
+    lat = np.array([x for xs in latencies for x in xs]) * 1000
+    intervals = np.concatenate([np.diff(xs) for xs in starts if len(xs) > 1] or [np.empty(0)])
+    return {
+        "config": config,
+        "sessions": n_sessions,
+        "reruns": int(len(lat)),
+        "reruns_per_s": len(lat) / wall,
+        "latency_p50_ms": _percentile(lat, 50),
+        "latency_p95_ms": _percentile(lat, 95),
+        "latency_p99_ms": _percentile(lat, 99),
+        "tick_p50_s": _percentile(intervals, 50),
+        "tick_p95_s": _percentile(intervals, 95),
+        "cpu_pct_per_session": 100 * cpu / wall / n_sessions,
+        # Growth over opening plus running the viewers, after warm-up
+        "rss_kb_per_session": ((rss_after - rss_before) / 1024 / n_sessions
+                               if rss_before is not None else float("nan")),
+        "state_kb_per_session": state_bytes / 1024 / n_sessions,
+    }
+
+
+def mark_degradation(report, tolerance):
+    """Flag rows whose p95 tick interval drifts past the config's lowest-load median"""
+    report["degraded"] = False
+    for config, rows in report.groupby("config"):
+        baseline = rows.sort_values("sessions")["tick_p50_s"].iloc[0]
+        report.loc[rows.index, "degraded"] = rows["tick_p95_s"] > baseline * (1 + tolerance)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless load test for the Quidditch Finance dashboard")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25, 50],
+                        help="Concurrent viewer counts to test, in order")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per load level")
+    parser.add_argument("--tick", type=float, default=1.0, help="Seconds between reruns, as in the app")
+    parser.add_argument("--config", choices=["per-session", "shared", "both"], default="both")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed p95 tick slowdown over the lightest level before flagging")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-rerun timeout in seconds")
+    parser.add_argument("--csv", help="Also write the report to this CSV file")
+    args = parser.parse_args(argv)
+
+    os.environ["QUIDDITCH_AUTO_RERUN"] = "0"
+    os.environ["QUIDDITCH_TICK_SECONDS"] = str(args.tick)
+    sys.path.insert(0, os.path.dirname(APP_PATH))
+
+    configs = list(CONFIGS) if args.config == "both" else [args.config]
+    rows = []
+    for config in configs:
+        for n in args.sessions:
+            print(f"⚡ {config}: {n} viewers for {args.duration:.0f}s...", file=sys.stderr)
+            rows.append(run_level(config, n, args.duration, args.tick, args.timeout))
+
+    report = mark_degradation(pd.DataFrame(rows), args.tolerance)
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    for config, rows in report.groupby("config"):
+        degraded = rows.loc[rows["degraded"], "sessions"]
+        verdict = f"degrades at {degraded.min()} viewers" if len(degraded) else "no degradation in tested range"
+        print(f"{config}: {verdict}")
+    if args.csv:
+        report.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Batched agent movement for the pitch: seekers chase the snitch and dodge bludgers.
+
+Every function works on stacked arrays shaped (..., agents, 2), so one call
+advances a single match, or thousands of agents across many matches, with
+the same vector operations. Arrays are updated in place.
+"""
+import numpy as np
+
+from game_state import HOUSE_NAMES
+
+PITCH_BOUND = 1.5       # Pitch half-width, shared by seekers, bludgers and the snitch
+EVADE_RADIUS = 0.5      # Bludgers closer than this push seekers away
+SNITCH_JITTER = 0.4
+SNITCH_FLEE = 0.15
+BLUDGER_SPEED = 0.2
+BLUDGER_JITTER = 0.1
+
+# House personalities. Jitter and drift keep the old random-walk ranges:
+# Gryffindor's uniform(-0.3, 0.5) is a bold +0.1 drift with ±0.4 jitter,
+# Ravenclaw's tight ±0.2 steps, everyone else ±0.25.
+HOUSE_MOTION = {
+    "Gryffindor": {"max_speed": 0.35, "accel": 0.15, "pursuit": 1.0, "evasion": 0.4, "jitter": 0.4, "drift": 0.1},
+    "Slytherin": {"max_speed": 0.3, "accel": 0.12, "pursuit": 0.9, "evasion": 0.8, "jitter": 0.25, "drift": 0.0},
+    "Ravenclaw": {"max_speed": 0.25, "accel": 0.1, "pursuit": 1.0, "evasion": 1.0, "jitter": 0.2, "drift": 0.0},
+    "Hufflepuff": {"max_speed": 0.25, "accel": 0.1, "pursuit": 0.8, "evasion": 1.2, "jitter": 0.25, "drift": 0.0},
+}
+MOTION_FIELDS = ("max_speed", "accel", "pursuit", "evasion", "jitter", "drift")
+
+
+def motion_params(house_idx=None):
+    """Per-agent parameter columns for agents labelled by house index (default: one per house)"""
+    table = np.array([[HOUSE_MOTION[h][f] for f in MOTION_FIELDS] for h in HOUSE_NAMES])
+    if house_idx is None:
+        house_idx = np.arange(len(HOUSE_NAMES))
+    rows = table[np.asarray(house_idx)]
+    return {f: rows[:, i] for i, f in enumerate(MOTION_FIELDS)}
+
+
+def _unit(v, eps=1e-9):
+    """Unit vectors and lengths along the last axis (zero vectors stay zero)"""
+    norm = np.sqrt((v * v).sum(axis=-1, keepdims=True))
+    return v / np.maximum(norm, eps), norm
+
+
+def _clip_norm(v, limit):
+    """Scale vectors down so their length is at most limit (broadcast over agents)"""
+    direction, norm = _unit(v)
+    return np.where(norm > limit, direction * limit, v)
+
+
+def step_seekers(pos, vel, params, snitch, snitch_active, bludgers, rng):
+    """Advance seekers one tick: steer toward the snitch, away from bludgers, within house limits"""
+    max_speed = params["max_speed"][:, None]
+
+    # Pursuit: head for the snitch at the house's preferred fraction of top speed
+    toward, _ = _unit(snitch[..., None, :] - pos)
+    active = np.asarray(snitch_active)[..., None, None]
+    desired = np.where(active, toward, 0.0) * (params["pursuit"][:, None] * max_speed)
+
+    # Evasion: every bludger inside the radius pushes harder the closer it is
+    away, dist = _unit(pos[..., :, None, :] - bludgers[..., None, :, :])
+    push = np.clip(1 - dist / EVADE_RADIUS, 0, None)
+    desired += (away * push).sum(axis=-2) * (params["evasion"][:, None] * max_speed)
+
+    # Personality: drift and jitter, as in the old random walk
+    desired += params["drift"][:, None]
+    desired += rng.uniform(-1, 1, size=pos.shape) * params["jitter"][:, None]
+
+    # Bounded acceleration and speed give the seekers inertia
+    vel += _clip_norm(desired - vel, params["accel"][:, None])
+    vel[...] = _clip_norm(vel, max_speed)
+    pos += vel
+
+    out = np.abs(pos) > PITCH_BOUND
+    vel[out] = 0.0
+    np.clip(pos, -PITCH_BOUND, PITCH_BOUND, out=pos)
+
+
+def step_snitch(snitch, seekers, rng):
+    """Snitch flits randomly and darts away from the nearest seeker"""
+    away, dist = _unit(snitch[..., None, :] - seekers)
+    nearest = np.take_along_axis(away, dist.argmin(axis=-2)[..., None], axis=-2)[..., 0, :]
+    snitch += nearest * SNITCH_FLEE + rng.uniform(-SNITCH_JITTER, SNITCH_JITTER, size=snitch.shape)
+    np.clip(snitch, -PITCH_BOUND, PITCH_BOUND, out=snitch)
+
+
+def step_bludgers(bludgers, seekers, rng):
+    """Each bludger chases its nearest seeker"""
+    toward, dist = _unit(seekers[..., None, :, :] - bludgers[..., :, None, :])
+    target = np.take_along_axis(toward, dist.argmin(axis=-2)[..., None], axis=-2)[..., 0, :]
+    bludgers += target * BLUDGER_SPEED + rng.uniform(-BLUDGER_JITTER, BLUDGER_JITTER, size=bludgers.shape)
+    np.clip(bludgers, -PITCH_BOUND, PITCH_BOUND, out=bludgers)
+
+
+def snitch_distances(seekers, snitch):
+    """Distance from every seeker to its match's snitch, shaped (..., agents)"""
+    diff = seekers - snitch[..., None, :]
+    return np.sqrt((diff * diff).sum(axis=-1))
@@ -0,0 +1,130 @@
+"""Scenario and sensitivity sweeps over the match tunables.
+
+Each point in a parameter grid or Latin-hypercube sample plays a batch of
+headless matches through the engine. Every point uses the same seed, so
+the points share their random numbers and differences between them come
+from the parameters rather than noise. Results are cached per point, so
+re-running an overlapping grid only plays the new points.
+
+    python sweep.py --grid bludger_prob=0.05,0.15,0.3 --grid snitch_bonus=50,150 --out sweep.csv
+    python sweep.py --lhs volatility_Slytherin=0.1:0.8 --lhs quaffle_prob=0.1:0.4 --samples 20
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from engine import DEFAULT_PARAMS, INTEGER_PARAMS, match_params, simulate_matches
+from game_state import HOUSE_NAMES
+
+CACHE_VERSION = 2       # Bump when engine rules change so stale points are recomputed
+DEFAULT_CACHE_DIR = ".sweep_cache"
+
+
+def grid(**axes):
+    """Cartesian product of parameter values, e.g. grid(bludger_prob=[0.1, 0.2])"""
+    match_params({name: values[0] for name, values in axes.items()})
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+def latin_hypercube(bounds, n, seed=None):
+    """n points with each parameter's range split into n strata, one sample per stratum"""
+    match_params({name: lo for name, (lo, hi) in bounds.items()})
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (lo, hi) in bounds.items():
+        strata = (rng.permutation(n) + rng.random(n)) / n
+        columns[name] = lo + strata * (hi - lo)
+        if name in INTEGER_PARAMS:
+            columns[name] = np.round(columns[name])  # Report the value the engine will play
+    return [{name: float(columns[name][i]) for name in bounds} for i in range(n)]
+
+
+def summarize(result):
+    """Per-house winner odds, snitch catches, price drift and volatility for one point"""
+    scores, prices, catcher = result["scores"], result["prices"], result["catcher"]
+    leaders = scores == scores.max(axis=1, keepdims=True)
+    wins = leaders / leaders.sum(axis=1, keepdims=True)  # Ties split the win
+    returns = prices[1:] / prices[:-1] - 1
+    return pd.DataFrame({
+        "house": HOUSE_NAMES,
+        "win_prob": wins.mean(axis=0),
+        "snitch_prob": [(catcher == i).mean() for i in range(len(HOUSE_NAMES))],
+        "mean_score": scores.mean(axis=0),
+        "price_drift": (prices[-1] / prices[0] - 1).mean(axis=0),
+        "price_vol": returns.std(axis=0, ddof=1).mean(axis=0),
+    })
+
+
+def _cache_path(cache_dir, params, n_matches, seed):
+    key = json.dumps({"params": {name: float(v) for name, v in params.items()},
+                      "matches": n_matches, "seed": seed, "version": CACHE_VERSION}, sort_keys=True)
+    return os.path.join(cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".csv")
+
+
+def run_sweep(points, n_matches=500, seed=0, cache_dir=DEFAULT_CACHE_DIR):
+    """Tidy results, one row per (point, house), with the point's full parameters as columns"""
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    frames = []
+    for point_id, point in enumerate(points):
+        params = match_params(point)
+        path = _cache_path(cache_dir, params, n_matches, seed) if cache_dir else None
+        if path and os.path.exists(path):
+            summary = pd.read_csv(path)
+        else:
+            summary = summarize(simulate_matches(n_matches, params, seed))
+            if path:
+                summary.to_csv(path, index=False)
+        frames.append(summary.assign(point=point_id, **params))
+    columns = ["point", *DEFAULT_PARAMS, "house", "win_prob", "snitch_prob",
+               "mean_score", "price_drift", "price_vol"]
+    return pd.concat(frames, ignore_index=True)[columns]
+
+
+def _parse_axis(spec, kind):
+    name, _, values = spec.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"Expected name=values, got {spec!r}")
+    if kind == "grid":
+        return name, [float(v) for v in values.split(",")]
+    lo, hi = values.split(":")
+    return name, (float(lo), float(hi))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scenario sweeps over Quidditch Finance tunables")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="Grid axis; repeat for a cartesian product")
+    parser.add_argument("--lhs", action="append", default=[], metavar="NAME=LO:HI",
+                        help="Latin-hypercube range; repeat per parameter")
+    parser.add_argument("--samples", type=int, default=10, help="Latin-hypercube sample count")
+    parser.add_argument("--matches", type=int, default=500, help="Matches per point")
+    parser.add_argument("--seed", type=int, default=0, help="Seed shared by every point")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Per-point cache; '' disables")
+    parser.add_argument("--out", help="Write the tidy table to this CSV file")
+    args = parser.parse_args(argv)
+
+    if args.grid and args.lhs:
+        parser.error("use either --grid or --lhs, not both")
+    if args.lhs:
+        bounds = dict(_parse_axis(spec, "lhs") for spec in args.lhs)
+        points = latin_hypercube(bounds, args.samples, args.seed)
+    else:
+        points = grid(**dict(_parse_axis(spec, "grid") for spec in args.grid))
+
+    print(f"⚡ {len(points)} points x {args.matches} matches", file=sys.stderr)
+    results = run_sweep(points, args.matches, args.seed, args.cache_dir)
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    if args.out:
+        results.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
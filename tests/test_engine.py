@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from engine import MatchEngine, match_params, simulate_matches
+
+
+def test_common_random_numbers_across_bludger_prob():
+    calm = simulate_matches(200, {"bludger_prob": 0.05}, seed=3)
+    rough = simulate_matches(200, {"bludger_prob": 0.3}, seed=3)
+
+    # Catches and prices don't depend on bludgers, so with shared draws they match exactly
+    assert (calm["catcher"] >= 0).any()
+    np.testing.assert_array_equal(calm["catcher"], rough["catcher"])
+    np.testing.assert_array_equal(calm["prices"], rough["prices"])
+    assert (calm["scores"] != rough["scores"]).any()
+
+
+def test_match_params_rounds_integer_tunables_and_rejects_unknown():
+    assert match_params({"snitch_bonus": 149.6})["snitch_bonus"] == 150
+    with pytest.raises(KeyError):
+        match_params({"snitch_prob": 0.5})
+
+
+def test_reset_starts_a_new_generation():
+    engine = MatchEngine(3, seed=0)
+    for _ in range(50):
+        out = engine.step()
+    prices = out["prices"]
+    engine.reset()
+
+    assert engine.generation == 1
+    assert engine.tick == 0
+    assert engine.scores.tolist() == [[10, 10, 10, 10]] * 3
+    assert engine.prices is not prices
+    assert engine.step()["generation"] == 1
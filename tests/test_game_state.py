@@ -0,0 +1,108 @@
+import gc
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from game_state import GameState, SessionStore
+
+
+def test_idle_session_spills_to_disk_and_restores(tmp_path):
+    store = SessionStore(idle_timeout=5, evict_timeout=60, spill_dir=str(tmp_path))
+    state = store.get("viewer")
+    state.active = True
+    state.scores[:] = [40, 30, 20, 10]
+    state.push_prices(np.array([101.0, 99.5, 100.25, 98.0]))
+    state.log_events("⚡ Bludger hit Slytherin!", "🏐 Ravenclaw scored!")
+    store.enforce_budget("viewer", state)
+
+    store.sweep(now=time.monotonic() + 10)
+    assert store.report()["live_sessions"] == 0
+    assert store.report()["spilled_sessions"] == 1
+    assert store.report()["live_bytes"] == 0
+    assert list(tmp_path.iterdir())
+
+    restored = store.get("viewer")
+    assert restored is not state
+    assert restored.active
+    assert restored.scores.tolist() == [40, 30, 20, 10]
+    assert restored.last_prices().tolist() == [101.0, 99.5, 100.25, 98.0]
+    assert list(restored.events) == ["⚡ Bludger hit Slytherin!", "🏐 Ravenclaw scored!"]
+    assert restored.events_bytes == state.events_bytes
+    assert store.report()["live_sessions"] == 1
+    assert not list(tmp_path.iterdir())
+
+
+def test_long_idle_spilled_session_is_evicted(tmp_path):
+    store = SessionStore(idle_timeout=5, evict_timeout=60, spill_dir=str(tmp_path))
+    store.get("viewer").scores[:] = 99
+    now = time.monotonic()
+    store.sweep(now=now + 10)
+    store.sweep(now=now + 120)
+
+    assert store.report()["spilled_sessions"] == 0
+    assert not list(tmp_path.iterdir())
+    assert store.get("viewer").scores.tolist() == [10, 10, 10, 10]
+
+
+def test_enforce_budget_drops_oldest_events_and_report_sums_sizes():
+    store = SessionStore(budget_bytes=GameState().nbytes() + 2000)
+    state = store.get("viewer")
+    state.log_events(*(f"event {i}" for i in range(100)))
+    size = store.enforce_budget("viewer", state)
+
+    assert size <= store.budget_bytes
+    assert state.events[-1] == "event 99"
+    assert len(state.events) < 100
+    assert store.report()["live_bytes"] == size
+    assert store.report()["max_session_bytes"] == size
+
+
+def test_shared_session_survives_concurrent_logging_and_trimming():
+    store = SessionStore(budget_bytes=GameState().nbytes() + 1000)
+    state = store.get("shared")
+    errors = []
+
+    def writer():
+        for i in range(3000):
+            store.log_events(state, f"event {i}")
+
+    def viewer():
+        try:
+            for _ in range(3000):
+                store.enforce_budget("shared", state)
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=writer), *(threading.Thread(target=viewer) for _ in range(3))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert state.events_bytes == sum(sys.getsizeof(event) for event in store.events(state))
+
+
+def test_owned_spill_dir_is_removed_on_close_and_collection():
+    store = SessionStore(idle_timeout=5)
+    store.get("viewer")
+    store.sweep(now=time.monotonic() + 10)
+    spill_dir = store.spill_dir
+    assert os.listdir(spill_dir)
+    store.close()
+    assert not os.path.exists(spill_dir)
+
+    spill_dir = SessionStore().spill_dir
+    gc.collect()
+    assert not os.path.exists(spill_dir)
+
+
+def test_close_keeps_a_caller_owned_spill_dir(tmp_path):
+    store = SessionStore(idle_timeout=5, spill_dir=str(tmp_path))
+    store.get("viewer")
+    store.sweep(now=time.monotonic() + 10)
+    store.close()
+    assert tmp_path.exists() and not list(tmp_path.iterdir())
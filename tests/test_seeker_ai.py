@@ -0,0 +1,36 @@
+import numpy as np
+
+from seeker_ai import PITCH_BOUND, motion_params, snitch_distances, step_bludgers, step_seekers, step_snitch
+
+
+def test_seekers_close_in_on_a_still_snitch():
+    rng = np.random.default_rng(0)
+    pos = np.array([[-1.0, -1.0], [1.0, -1.0], [-1.0, 1.0], [1.0, 1.0]])
+    vel = np.zeros_like(pos)
+    snitch = np.zeros(2)
+    far_bludgers = np.full((2, 2), 10.0)
+    start = snitch_distances(pos, snitch)
+
+    for _ in range(20):
+        step_seekers(pos, vel, motion_params(), snitch, True, far_bludgers, rng)
+
+    assert snitch_distances(pos, snitch).mean() < start.mean() / 2
+
+
+def test_batched_agents_stay_on_the_pitch():
+    rng = np.random.default_rng(1)
+    n_matches = 64
+    pos = rng.uniform(-PITCH_BOUND, PITCH_BOUND, (n_matches, 4, 2))
+    vel = np.zeros_like(pos)
+    snitch = rng.uniform(-PITCH_BOUND, PITCH_BOUND, (n_matches, 2))
+    bludgers = rng.uniform(-PITCH_BOUND, PITCH_BOUND, (n_matches, 2, 2))
+    active = rng.random(n_matches) < 0.5
+
+    for _ in range(200):
+        step_seekers(pos, vel, motion_params(), snitch, active, bludgers, rng)
+        step_bludgers(bludgers, pos, rng)
+        step_snitch(snitch, pos, rng)
+
+    for agents in (pos, bludgers, snitch):
+        assert np.all(np.abs(agents) <= PITCH_BOUND)
+    assert np.all(np.linalg.norm(vel, axis=-1) <= motion_params()["max_speed"] + 1e-9)
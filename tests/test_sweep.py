@@ -0,0 +1,34 @@
+import numpy as np
+
+import sweep
+from engine import simulate_matches
+
+
+def test_cache_only_plays_new_points(tmp_path, monkeypatch):
+    played = []
+
+    def counting_simulate(n_matches, params, seed):
+        played.append(params["bludger_prob"])
+        return simulate_matches(n_matches, params, seed)
+
+    monkeypatch.setattr(sweep, "simulate_matches", counting_simulate)
+    first = sweep.run_sweep(sweep.grid(bludger_prob=[0.1, 0.2]), n_matches=20, cache_dir=str(tmp_path))
+    second = sweep.run_sweep(sweep.grid(bludger_prob=[0.1, 0.2, 0.3]), n_matches=20, cache_dir=str(tmp_path))
+
+    assert played == [0.1, 0.2, 0.3]
+    np.testing.assert_allclose(second[second["point"] < 2]["win_prob"], first["win_prob"])
+
+
+def test_latin_hypercube_one_sample_per_stratum():
+    n = 16
+    points = sweep.latin_hypercube({"bludger_prob": (0.0, 0.4), "quaffle_prob": (0.1, 0.3)}, n, seed=7)
+
+    assert len(points) == n
+    for name, (lo, hi) in {"bludger_prob": (0.0, 0.4), "quaffle_prob": (0.1, 0.3)}.items():
+        strata = np.floor((np.array([p[name] for p in points]) - lo) / (hi - lo) * n)
+        assert sorted(strata) == list(range(n))
+
+
+def test_latin_hypercube_reports_rounded_integer_tunables():
+    points = sweep.latin_hypercube({"snitch_bonus": (50, 250)}, 8, seed=0)
+    assert all(p["snitch_bonus"] == round(p["snitch_bonus"]) for p in points)
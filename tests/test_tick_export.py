@@ -0,0 +1,73 @@
+import json
+import socket
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from engine import MatchEngine
+from game_state import HOUSE_NAMES, MATCH_SECONDS
+from tick_export import Subscription, TickPublisher, TickWebSocketServer, run_engine
+
+
+def _published_batches(n_matches, ticks, fmt="ndjson"):
+    publisher = TickPublisher(max_batch=50)
+    sub = publisher.subscribe("test", fmt)
+    publisher.start()
+    run_engine(MatchEngine(n_matches, seed=0), publisher, ticks)
+    publisher.stop()
+    return sub.drain()
+
+
+def test_subscription_drops_oldest_batches_and_counts_steps():
+    sub = Subscription("slow", max_pending=10)
+    batches = [SimpleNamespace(n_steps=4) for _ in range(4)]
+    for batch in batches:
+        sub.offer(batch)
+
+    assert sub.drain() == batches[2:]
+    assert sub.dropped == 8
+    assert sub.pending == 0
+
+
+def test_batch_columns_one_row_per_match_tick():
+    n_matches, ticks = 3, 120
+    columns = {}
+    for batch in _published_batches(n_matches, ticks):
+        for name, column in batch.columns.items():
+            columns.setdefault(name, []).append(column)
+    columns = {name: np.concatenate(parts) for name, parts in columns.items()}
+
+    assert list(columns) == [
+        "generation", "tick", "match", "price_tick",
+        *(f"price_{house}" for house in HOUSE_NAMES), *(f"score_{house}" for house in HOUSE_NAMES),
+        "bludger_house", "bludger_damage", "quaffle_house", "catch_house",
+    ]
+    assert all(len(column) == n_matches * ticks for column in columns.values())
+    np.testing.assert_array_equal(columns["tick"][:6], [1, 1, 1, 2, 2, 2])
+    np.testing.assert_array_equal(columns["match"][:6], [0, 1, 2, 0, 1, 2])
+    np.testing.assert_array_equal(columns["price_tick"], columns["tick"] % 5 == 0)
+
+
+def test_ndjson_rows_match_columns_and_matches_restart():
+    ticks = MATCH_SECONDS + 20
+    batches = _published_batches(2, ticks)
+    rows = [json.loads(line) for batch in batches for line in batch.ndjson.splitlines()]
+
+    assert len(rows) == 2 * ticks
+    assert rows[0]["generation"] == 0 and rows[0]["tick"] == 1
+    assert rows[-1]["generation"] == 1 and rows[-1]["tick"] == 20
+    assert rows[0]["bludger_house"] in (None, *HOUSE_NAMES)
+    last = batches[-1].columns
+    assert rows[-1]["price_Gryffindor"] == last["price_Gryffindor"][-1]
+    assert rows[-1]["score_Hufflepuff"] == last["score_Hufflepuff"][-1]
+
+
+def test_websocket_bind_failure_is_raised_from_start():
+    pytest.importorskip("websockets")
+    with socket.socket() as busy:
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        server = TickWebSocketServer(TickPublisher(), port=busy.getsockname()[1])
+        with pytest.raises(OSError):
+            server.start()
@@ -0,0 +1,406 @@
+"""Publish/subscribe export of live engine ticks to external consumers.
+
+The engine thread calls TickPublisher.publish() once per step, which only
+appends the step to a bounded queue. One encoder thread drains that queue
+in batches and encodes each batch once per wire format. Every subscriber
+then receives the same encoded batch, so adding subscribers adds no
+encoding work. Each subscriber has its own bounded buffer. One that falls
+behind loses its oldest batches, counted in stats(), and never blocks the
+engine or the other subscribers.
+
+* NDJSONSink  - append-only newline-delimited JSON, one row per match tick
+* ArrowSink   - Arrow IPC stream file, one record batch per encoded batch (needs pyarrow)
+* TickWebSocketServer - local WebSocket feed, one NDJSON text message per batch per client
+
+    python tick_export.py --ticks 200000 --ndjson ticks.ndjson --arrow ticks.arrow --ws 8765
+"""
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from engine import MatchEngine
+from game_state import HOUSE_NAMES, MATCH_SECONDS
+
+DEFAULT_MAX_PENDING = 50_000    # Engine steps buffered per subscriber before dropping
+DEFAULT_MAX_BATCH = 2_000       # Engine steps per encoded batch
+FLUSH_INTERVAL = 0.01           # Seconds a worker sleeps when it has nothing to do
+
+EVENT_COLUMNS = ("bludger_house", "bludger_damage", "quaffle_house", "catch_house")
+HOUSE_COLUMNS = ("bludger_house", "quaffle_house", "catch_house")
+_HOUSE_JSON = ["null", *(f'"{house}"' for house in HOUSE_NAMES)]  # -1 (no event) maps to null
+
+
+class EncodedBatch:
+    """A batch of engine steps, encoded once and shared by every subscriber"""
+    __slots__ = ('n_steps', 'columns', 'ndjson', 'arrow')
+
+    def __init__(self, steps, formats):
+        self.n_steps = len(steps)
+        self.columns = batch_columns(steps)
+        self.ndjson = encode_ndjson(self.columns) if "ndjson" in formats else None
+        self.arrow = encode_arrow(self.columns) if "arrow" in formats else None
+
+
+class Subscription:
+    """Bounded, drop-oldest buffer of encoded batches for one consumer"""
+    __slots__ = ('name', 'format', 'max_pending', 'pending', 'dropped', 'delivered', '_batches', '_lock')
+
+    def __init__(self, name, fmt="ndjson", max_pending=DEFAULT_MAX_PENDING):
+        self.name = name
+        self.format = fmt
+        self.max_pending = max_pending  # In engine steps
+        self.pending = 0
+        self.dropped = 0
+        self.delivered = 0
+        self._batches = deque()
+        self._lock = threading.Lock()
+
+    def offer(self, batch):
+        with self._lock:
+            while self._batches and self.pending + batch.n_steps > self.max_pending:
+                oldest = self._batches.popleft()
+                self.pending -= oldest.n_steps
+                self.dropped += oldest.n_steps
+            self._batches.append(batch)
+            self.pending += batch.n_steps
+
+    def drain(self):
+        """Take every buffered batch, oldest first"""
+        with self._lock:
+            batches = list(self._batches)
+            self._batches.clear()
+            self.pending = 0
+        return batches
+
+
+class TickPublisher:
+    """Fans engine tick output out to subscribers without ever blocking the engine"""
+
+    def __init__(self, max_pending=DEFAULT_MAX_PENDING, max_batch=DEFAULT_MAX_BATCH):
+        self.max_batch = max_batch
+        self.published = 0
+        self.dropped = 0
+        self._subscribers = ()
+        self._lock = threading.Lock()
+        self._steps = deque(maxlen=max_pending)
+        self._stop_event = threading.Event()
+        self._encoder = threading.Thread(target=self._run, name="tick-encoder", daemon=True)
+
+    def start(self):
+        self._encoder.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Encode and hand out what is still queued, then stop the encoder"""
+        self._stop_event.set()
+        self._encoder.join(timeout)
+
+    def subscribe(self, name, fmt="ndjson", max_pending=DEFAULT_MAX_PENDING):
+        sub = Subscription(name, fmt, max_pending)
+        with self._lock:
+            self._subscribers = self._subscribers + (sub,)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not sub)
+
+    def publish(self, out):
+        """Queue one MatchEngine.step() result; encoding happens on the encoder thread"""
+        if len(self._steps) == self._steps.maxlen:
+            self.dropped += 1
+        # Scores are updated in place by the engine; prices and events are fresh arrays
+        self._steps.append((out["generation"], out["tick"], out["price_tick"], out["prices"],
+                            out["scores"].copy(), *(out[c] for c in EVENT_COLUMNS)))
+        self.published += 1
+
+    def _run(self):
+        popleft = self._steps.popleft
+        while True:
+            steps = []
+            try:
+                for _ in range(self.max_batch):
+                    steps.append(popleft())
+            except IndexError:
+                pass
+            if not steps:
+                if self._stop_event.is_set():
+                    break
+                time.sleep(FLUSH_INTERVAL)
+                continue
+            subscribers = self._subscribers
+            if subscribers:
+                batch = EncodedBatch(steps, {sub.format for sub in subscribers})
+                for sub in subscribers:
+                    sub.offer(batch)
+
+    def stats(self):
+        return {
+            "published": self.published,
+            "dropped": self.dropped,
+            "subscribers": [
+                {"name": s.name, "delivered": s.delivered, "dropped": s.dropped, "pending": s.pending}
+                for s in self._subscribers
+            ],
+        }
+
+
+def batch_columns(steps):
+    """Stack a batch of engine steps into flat columns, one row per match tick"""
+    n_matches = len(steps[0][3])
+    columns = {
+        "generation": np.repeat(np.array([step[0] for step in steps]), n_matches),
+        "tick": np.repeat(np.array([step[1] for step in steps]), n_matches),
+        "match": np.tile(np.arange(n_matches), len(steps)),
+        "price_tick": np.repeat(np.array([step[2] for step in steps]), n_matches),
+    }
+    prices = np.concatenate([step[3] for step in steps])
+    scores = np.concatenate([step[4] for step in steps])
+    for i, house in enumerate(HOUSE_NAMES):
+        columns[f"price_{house}"] = prices[:, i]
+    for i, house in enumerate(HOUSE_NAMES):
+        columns[f"score_{house}"] = scores[:, i]
+    for j, name in enumerate(EVENT_COLUMNS):
+        columns[name] = np.concatenate([step[5 + j] for step in steps])
+    return columns
+
+
+def encode_ndjson(columns):
+    """One JSON object per row, formatted from a fixed per-schema template"""
+    fields, values = [], []
+    for name, column in columns.items():
+        if name in HOUSE_COLUMNS:
+            fields.append(f'"{name}":%s')
+            values.append([_HOUSE_JSON[i + 1] for i in column.tolist()])
+        elif column.dtype == bool:
+            fields.append(f'"{name}":%s')
+            values.append(["true" if v else "false" for v in column.tolist()])
+        elif column.dtype.kind == "f":
+            fields.append(f'"{name}":%r')  # repr matches JSON for finite floats
+            values.append(column.tolist())
+        else:
+            fields.append(f'"{name}":%d')
+            values.append(column.tolist())
+    template = "{" + ",".join(fields) + "}\n"
+    return "".join([template % row for row in zip(*values)])
+
+
+def encode_arrow(columns):
+    try:
+        import pyarrow as pa
+    except ImportError as err:
+        raise ImportError("Arrow export requires pyarrow. Use pip to install the pyarrow package.") from err
+    return pa.table(columns)
+
+
+class NDJSONSink:
+    """Append-only newline-delimited JSON file"""
+    format = "ndjson"
+
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, batch):
+        self._file.write(batch.ndjson)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ArrowSink:
+    """Arrow IPC stream file; each encoded batch becomes one record batch"""
+    format = "arrow"
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+        except ImportError as err:
+            raise ImportError("ArrowSink requires pyarrow. Use pip to install the pyarrow package.") from err
+        self._pa = pa
+        self._path = path
+        self._writer = None
+
+    def write(self, batch):
+        if self._writer is None:
+            self._writer = self._pa.ipc.new_stream(self._path, batch.arrow.schema)
+        self._writer.write_table(batch.arrow)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class SinkWorker(threading.Thread):
+    """Writes one subscription's batches to a sink on its own thread"""
+
+    def __init__(self, publisher, sink, name, max_pending=DEFAULT_MAX_PENDING):
+        super().__init__(name=f"tick-sink-{name}", daemon=True)
+        self.publisher = publisher
+        self.sink = sink
+        self.subscription = publisher.subscribe(name, sink.format, max_pending)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        sub = self.subscription
+        try:
+            while True:
+                batches = sub.drain()
+                for batch in batches:
+                    self.sink.write(batch)
+                    sub.delivered += batch.n_steps
+                if not batches:
+                    if self._stop_event.is_set():
+                        break
+                    time.sleep(FLUSH_INTERVAL)
+        finally:
+            self.publisher.unsubscribe(sub)
+            self.sink.close()
+
+    def stop(self, timeout=None):
+        """Deliver what is still buffered, then close the sink"""
+        self._stop_event.set()
+        self.join(timeout)
+
+
+class TickWebSocketServer:
+    """Local WebSocket feed; every client gets its own subscription"""
+
+    def __init__(self, publisher, host="127.0.0.1", port=8765, max_pending=DEFAULT_MAX_PENDING):
+        self.publisher = publisher
+        self.host = host
+        self.port = port
+        self.max_pending = max_pending
+        self._loop = None
+        self._stopped = None
+        self._error = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tick-websocket", daemon=True)
+
+    def start(self):
+        """Serve on a background thread; a failure to bind is raised here, on the caller's thread"""
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            raise self._error
+        return self
+
+    def stop(self, timeout=None):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        self._thread.join(timeout)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve())
+        except Exception as err:
+            self._error = err
+        finally:
+            self._ready.set()  # Never leave start() waiting, even when serve() failed
+            self._loop.close()
+
+    async def _serve(self):
+        import websockets
+
+        self._stopped = asyncio.Event()
+        async with websockets.serve(self._handle, self.host, self.port):
+            self._ready.set()
+            await self._stopped.wait()
+
+    async def _handle(self, websocket, *_):
+        from websockets.exceptions import ConnectionClosed
+
+        peer = websocket.remote_address
+        name = f"ws:{peer[0]}:{peer[1]}" if peer else "ws"
+        sub = self.publisher.subscribe(name, "ndjson", self.max_pending)
+        try:
+            while not self._stopped.is_set():
+                batches = sub.drain()
+                if not batches:
+                    await asyncio.sleep(FLUSH_INTERVAL)
+                    continue
+                # A slow client makes send() wait here; its buffer absorbs that, not the engine
+                for batch in batches:
+                    await websocket.send(batch.ndjson)
+                    sub.delivered += batch.n_steps
+        except ConnectionClosed:
+            pass
+        finally:
+            self.publisher.unsubscribe(sub)
+
+
+def run_engine(engine, publisher, ticks, rate=None):
+    """Step the engine and publish every tick; rate caps steps per second (None = flat out)
+
+    Matches last MATCH_SECONDS ticks, then the engine resets and the next
+    generation starts, as when a viewer presses Start Match again.
+    """
+    interval = 1 / rate if rate else 0
+    next_at = time.perf_counter()
+    for _ in range(ticks):
+        if engine.tick >= MATCH_SECONDS:
+            engine.reset()
+        publisher.publish(engine.step())
+        if interval:
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream Quidditch Finance engine ticks to external consumers")
+    parser.add_argument("--matches", type=int, default=1, help="Matches advanced per engine step")
+    parser.add_argument("--ticks", type=int, default=10_000, help="Engine steps to run")
+    parser.add_argument("--rate", type=float, help="Engine steps per second (default: as fast as possible)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--ndjson", help="Append ticks to this NDJSON file")
+    parser.add_argument("--arrow", help="Write ticks to this Arrow IPC stream file")
+    parser.add_argument("--ws", type=int, metavar="PORT", help="Serve ticks over WebSocket on localhost")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="Steps buffered per subscriber before the oldest are dropped")
+    args = parser.parse_args(argv)
+
+    publisher = TickPublisher(args.max_pending)
+    server = None
+    if args.ws:
+        # Bind before opening any sink files, so a busy port leaves nothing behind
+        try:
+            server = TickWebSocketServer(publisher, port=args.ws, max_pending=args.max_pending).start()
+        except OSError as err:
+            parser.error(f"cannot serve WebSocket on port {args.ws}: {err}")
+    workers = []
+    if args.ndjson:
+        workers.append(SinkWorker(publisher, NDJSONSink(args.ndjson), "ndjson", args.max_pending))
+    if args.arrow:
+        workers.append(SinkWorker(publisher, ArrowSink(args.arrow), "arrow", args.max_pending))
+    publisher.start()
+    for worker in workers:
+        worker.start()
+
+    subscriptions = [worker.subscription for worker in workers]
+    engine = MatchEngine(args.matches, seed=args.seed)
+    started = time.perf_counter()
+    run_engine(engine, publisher, args.ticks, args.rate)
+    elapsed = time.perf_counter() - started
+    publisher.stop()
+    for worker in workers:
+        worker.stop()
+    if server:
+        server.stop()
+
+    print(f"⚡ {args.ticks} steps x {args.matches} matches in {elapsed:.2f}s "
+          f"({args.ticks / elapsed:,.0f} steps/s)", file=sys.stderr)
+    for sub in subscriptions:
+        print(f"  {sub.name}: {sub.delivered} delivered, {sub.dropped} dropped", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,23 @@ import random
 import base64
 from io import BytesIO
 import json
+import os
+import uuid
+
+from game_state import (
+    BLUDGER_PROB, CATCH_PROB, CATCH_RADIUS, HOUSES, HOUSE_INDEX, HOUSE_NAMES, MATCH_SECONDS,
+    QUAFFLE_PROB, SNITCH_APPEARS, SNITCH_BONUS, SessionStore
+)
+from engine import step_prices
+from seeker_ai import motion_params, snitch_distances, step_bludgers, step_seekers, step_snitch
 
 st.set_page_config(page_title="Quidditch Finance", page_icon="⚡", layout="wide")
 
+# Runtime knobs, mainly for the headless load test (load_test.py)
+TICK_SECONDS = float(os.environ.get("QUIDDITCH_TICK_SECONDS", "1"))
+AUTO_RERUN = os.environ.get("QUIDDITCH_AUTO_RERUN", "1") != "0"
+SHARED_ENGINE = os.environ.get("QUIDDITCH_SHARED_ENGINE", "0") == "1"
+
 
 st.markdown("""
 <style>
@@ -68,128 +82,69 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-HOUSES = {
-    "Gryffindor": {
-        "color": "#AE0001", 
-        "volatility": 0.3,
-        "mascot": "🦁",
-        "traits": "Bravery, Nerve, Courage"
-    },
-    "Slytherin": {
-        "color": "#2A623D", 
-        "volatility": 0.4,
-        "mascot": "🐍",
-        "traits": "Ambition, Cunning, Resourcefulness"
-    },
-    "Ravenclaw": {
-        "color": "#0E1A40", 
-        "volatility": 0.25,
-        "mascot": "🦅",
-        "traits": "Intelligence, Wisdom, Creativity"
-    },
-    "Hufflepuff": {
-        "color": "#FFDB00", 
-        "volatility": 0.2,
-        "mascot": "🦡",
-        "traits": "Loyalty, Patience, Fair Play"
-    }
-}
-
-
-if 'game' not in st.session_state:
-    st.session_state.game = {
-        'active': False,
-        'scores': {house: 10 for house in HOUSES},
-        'prices': {house: [100] for house in HOUSES},
-        'positions': {house: (0,0) for house in HOUSES},
-        'snitch': False,
-        'snitch_position': (0, 0),
-        'start_time': None,
-        'history': [],
-        'events': [],
-        'vr_mode': False
-    }
+@st.cache_resource
+def get_session_store():
+    """One state registry shared by every viewer session"""
+    return SessionStore()
 
 
-def generate_price(house):
-    """Magical price generator with house characteristics"""
-    last_price = st.session_state.game['prices'][house][-1]
-    base_change = HOUSES[house]['volatility'] * random.uniform(-0.1, 0.1)
-    
-    # House-specific behaviors
-    if house == "Slytherin" and random.random() < 0.1:
-        base_change = abs(base_change)  # Slytherin sometimes manipulates the market
-    elif house == "Hufflepuff":
-        base_change *= 0.8  # More stable
-        
-    new_price = max(50, last_price * (1 + base_change))
-    return round(new_price, 2)
+if 'session_key' not in st.session_state:
+    st.session_state.session_key = uuid.uuid4().hex
+
+SEEKER_MOTION = motion_params()
+HOUSE_VOLATILITY = np.array([HOUSES[house]['volatility'] for house in HOUSE_NAMES])
+rng = np.random.default_rng()
+
+# A shared engine serves one match to every viewer instead of one per session
+game_key = "shared" if SHARED_ENGINE else st.session_state.session_key
+session_store = get_session_store()
+session_store.sweep()
+game = session_store.get(game_key)
+
 
 def update_positions():
-    """Update seeker positions with house tendencies"""
-    for house in HOUSES:
-        x, y = st.session_state.game['positions'][house]
-        
-        # House-specific movement patterns
-        if house == "Gryffindor":
-            x += random.uniform(-0.3, 0.5)  # Bold moves
-            y += random.uniform(-0.3, 0.5)
-        elif house == "Ravenclaw":
-            x += random.uniform(-0.2, 0.2)  # Calculated moves
-            y += random.uniform(-0.2, 0.2)
-        else:
-            x += random.uniform(-0.25, 0.25)
-            y += random.uniform(-0.25, 0.25)
-            
-        # Keep within bounds
-        x = max(-1, min(1, x))
-        y = max(-1, min(1, y))
-        st.session_state.game['positions'][house] = (x, y)
+    """Move seekers, bludgers and the snitch one tick with the batched pursuit model"""
+    step_seekers(game.positions, game.velocities, SEEKER_MOTION,
+                 game.snitch_position, game.snitch, game.bludgers, rng)
+    step_bludgers(game.bludgers, game.positions, rng)
     
     # Update snitch position if it's active
-    if st.session_state.game['snitch']:
-        sx, sy = st.session_state.game['snitch_position']
-        st.session_state.game['snitch_position'] = (
-            max(-1.5, min(1.5, sx + random.uniform(-0.4, 0.4))),
-            max(-1.5, min(1.5, sy + random.uniform(-0.4, 0.4)))
-        )
-    elif not st.session_state.game['snitch'] and st.session_state.game['active']:
-        elapsed = datetime.now() - st.session_state.game['start_time']
-        if elapsed.seconds > 120:  # Snitch appears after 2 minutes
-            st.session_state.game['snitch'] = True
-            st.session_state.game['snitch_position'] = (
-                random.uniform(-1, 1),
-                random.uniform(-1, 1))
-            st.session_state.game['events'].append("✨ The Golden Snitch has appeared!")
+    if game.snitch:
+        step_snitch(game.snitch_position, game.positions, rng)
+    elif not game.snitch and game.active:
+        elapsed = datetime.now() - game.start_time
+        if elapsed.seconds > SNITCH_APPEARS:  # Snitch appears after 2 minutes
+            game.snitch = True
+            game.snitch_position[:] = rng.uniform(-1, 1, size=2)
+            session_store.log_events(game, "✨ The Golden Snitch has appeared!")
 
 def simulate_events():
     """Magical events during the match"""
     events = []
     
     # Bludger attacks
-    if random.random() < 0.15:
-        house = random.choice(list(HOUSES.keys()))
+    if random.random() < BLUDGER_PROB:
+        house = random.choice(HOUSE_NAMES)
         damage = random.randint(1, 5)
-        st.session_state.game['scores'][house] = max(0, st.session_state.game['scores'][house] - damage)
+        i = HOUSE_INDEX[house]
+        game.scores[i] = max(0, game.scores[i] - damage)
         events.append(f"💥 Bludger hit {HOUSES[house]['mascot']} {house}! (-{damage} points)")
     
     # Random quaffle goals
-    if random.random() < 0.2:
-        scorer = random.choice(list(HOUSES.keys()))
-        st.session_state.game['scores'][scorer] += 10
+    if random.random() < QUAFFLE_PROB:
+        scorer = random.choice(HOUSE_NAMES)
+        game.scores[HOUSE_INDEX[scorer]] += 10
         events.append(f"⚽ {HOUSES[scorer]['mascot']} {scorer} scored with the Quaffle! (+10 points)")
     
     # Check for snitch catch
-    if st.session_state.game['snitch']:
-        for house in HOUSES:
-            hx, hy = st.session_state.game['positions'][house]
-            sx, sy = st.session_state.game['snitch_position']
-            distance = ((hx - sx)*2 + (hy - sy)*2)*0.5
-            if distance < 0.2 and random.random() < 0.3:  # 30% chance to catch when close
-                st.session_state.game['scores'][house] += 150
-                st.session_state.game['snitch'] = False
-                events.append(f"✨ {HOUSES[house]['mascot']} {house} caught the Golden Snitch! +150 points!")
-                st.session_state.game['events'].extend(events)
+    if game.snitch:
+        distances = snitch_distances(game.positions, game.snitch_position)
+        for i, house in enumerate(HOUSE_NAMES):
+            if distances[i] < CATCH_RADIUS and random.random() < CATCH_PROB:  # 30% chance to catch when close
+                game.scores[i] += SNITCH_BONUS
+                game.snitch = False
+                events.append(f"✨ {HOUSES[house]['mascot']} {house} caught the Golden Snitch! +{SNITCH_BONUS} points!")
+                session_store.log_events(game, *events)
                 st.balloons()
                 break
     
@@ -204,12 +159,12 @@ def show_vr_mode():
     house_data = [{
         "name": house,
         "color": HOUSES[house]['color'],
-        "position": list(st.session_state.game['positions'][house])
-    } for house in HOUSES]
+        "position": game.positions[i].tolist()
+    } for i, house in enumerate(HOUSE_NAMES)]
 
     snitch_data = {
-        "active": st.session_state.game['snitch'],
-        "position": list(st.session_state.game['snitch_position']) if st.session_state.game['snitch'] else [0, 0]
+        "active": game.snitch,
+        "position": game.snitch_position.tolist() if game.snitch else [0, 0]
     }
 
     html_content = f"""
@@ -475,21 +430,22 @@ def show_vr_mode():
 # ========== ENCHANTED VISUALIZATION ==========
 def draw_pitch():
     """Magical pitch visualization"""
+    leader = int(game.scores.argmax())
     df = pd.DataFrame([
         {
             "House": house, 
-            "X": pos[0], 
-            "Y": pos[1], 
+            "X": game.positions[i, 0], 
+            "Y": game.positions[i, 1], 
             "Color": HOUSES[house]['color'],
             "Mascot": HOUSES[house]['mascot'],
-            "Size": 30 if house == max(st.session_state.game['scores'].items(), key=lambda x: x[1])[0] else 20
+            "Size": 30 if i == leader else 20
         }
-        for house, pos in st.session_state.game['positions'].items()
+        for i, house in enumerate(HOUSE_NAMES)
     ])
     
     # Add golden snitch if it appears
-    if st.session_state.game['snitch']:
-        sx, sy = st.session_state.game['snitch_position']
+    if game.snitch:
+        sx, sy = game.snitch_position
         snitch_df = pd.DataFrame([{
             "House": "Golden Snitch", 
             "X": sx, "Y": sy, 
@@ -499,9 +455,18 @@ def draw_pitch():
         }])
         df = pd.concat([df, snitch_df], ignore_index=True)
     
+    bludger_df = pd.DataFrame([{
+        "House": "Bludger",
+        "X": bx, "Y": by,
+        "Color": "#3B3B3B",
+        "Mascot": "💣",
+        "Size": 12
+    } for bx, by in game.bludgers.tolist()])
+    df = pd.concat([df, bludger_df], ignore_index=True)
+    
     fig = px.scatter(
         df, x="X", y="Y", color="House", text="Mascot",
-        color_discrete_map={h: HOUSES[h]['color'] for h in HOUSES},
+        color_discrete_map={**{h: HOUSES[h]['color'] for h in HOUSES}, "Bludger": "#3B3B3B"},
         range_x=[-1.5,1.5], range_y=[-1.5,1.5],
         title="<b>Quidditch Pitch - Seeker Positions</b>",
         size="Size", size_max=45,
@@ -534,7 +499,7 @@ def draw_pitch():
 
 def draw_performance():
     """House stock performance"""
-    df = pd.DataFrame(st.session_state.game['prices'])
+    df = pd.DataFrame(game.price_history(), columns=HOUSE_NAMES)
     
     fig = px.line(
         df, 
@@ -558,7 +523,7 @@ def show_final_results():
     st.markdown("## 🏆 Match Results")
     
     # Final scores
-    final_scores = st.session_state.game['scores']
+    final_scores = dict(zip(HOUSE_NAMES, game.scores.tolist()))
     winner = max(final_scores.items(), key=lambda x: x[1])[0]
     
     cols = st.columns(4)
@@ -573,7 +538,7 @@ def show_final_results():
     
     # Historical price data
     st.markdown("## 📜 Historical Stock Data")
-    history_df = pd.DataFrame(st.session_state.game['prices'])
+    history_df = pd.DataFrame(game.price_history(), columns=HOUSE_NAMES)
     st.dataframe(history_df.style.background_gradient(axis=0), use_container_width=True)
     
     # Performance charts
@@ -622,9 +587,10 @@ def show_final_results():
         st.plotly_chart(fig2, use_container_width=True)
     
     # Event log
-    if st.session_state.game['events']:
+    events = session_store.events(game)
+    if events:
         st.markdown("## 📜 Match Event Log")
-        for event in st.session_state.game['events']:
+        for event in events:
             st.write(f"- {event}")
 
 # ========== STREAMLIT UI ==========
@@ -635,23 +601,24 @@ st.caption("A magical fusion of wizard banking and quidditch strategy")
 with st.sidebar:
     st.markdown("<h2 style='color:#D4AF37'>⚡ Match Controls</h2>", unsafe_allow_html=True)
     
-    if st.button("Start Match ✨", disabled=st.session_state.game['active'], 
+    if st.button("Start Match ✨", disabled=game.active, 
                 help="Begin the quidditch match and market simulation"):
-        st.session_state.game['active'] = True
-        st.session_state.game['start_time'] = datetime.now()
-        st.session_state.game['events'] = []
-        st.session_state.game['snitch'] = False
+        game.active = True
+        game.start_time = datetime.now()
+        session_store.clear_events(game)
+        game.snitch = False
         st.rerun()
         
-    if st.button("Stop Match 🏁", disabled=not st.session_state.game['active'],
+    if st.button("Stop Match 🏁", disabled=not game.active,
                 help="End the current match"):
-        st.session_state.game['active'] = False
+        game.active = False
         st.rerun()
     
     # VR mode toggle
     st.markdown("<h2 style='color:#D4AF37'>🕶 VR Mode</h2>", unsafe_allow_html=True)
-    st.session_state.game['vr_mode'] = st.toggle("Enable VR", value=False, 
-                                               help="Experimental VR mode for immersive experience")
+    # A per-viewer preference, kept out of the (possibly shared) match state
+    vr_mode = st.toggle("Enable VR", value=False, 
+                        help="Experimental VR mode for immersive experience")
     
     st.markdown("<h2 style='color:#D4AF37'>🏰 House Information</h2>", unsafe_allow_html=True)
     for house, data in HOUSES.items():
@@ -664,30 +631,42 @@ with st.sidebar:
         """, unsafe_allow_html=True)
     
     st.markdown("<h2 style='color:#D4AF37'>📊 Current Scores</h2>", unsafe_allow_html=True)
-    for house, score in st.session_state.game['scores'].items():
+    for house, score in zip(HOUSE_NAMES, game.scores.tolist()):
         st.metric(
             label=f"{HOUSES[house]['mascot']} {house}", 
             value=score,
             delta_color="off"
         )
 
+    st.markdown("<h2 style='color:#D4AF37'>🧠 Session Memory</h2>", unsafe_allow_html=True)
+    session_bytes = session_store.enforce_budget(game_key, game)
+    memory = session_store.report()
+    st.session_state.memory_report = memory
+    st.progress(min(session_bytes / memory['budget_bytes'], 1.0),
+                f"This session: {session_bytes / 1024:.1f} KB of {memory['budget_bytes'] / 1024:.0f} KB")
+    st.caption(f"{memory['live_sessions']} live / {memory['spilled_sessions']} spilled sessions, "
+               f"{memory['live_bytes'] / 1024:.1f} KB in memory")
+
+# A shared engine advances the match once per tick, not once per viewer rerun
+advance = game.active and session_store.claim_tick(game_key, TICK_SECONDS)
+
 # Main Game Area
 tab1, tab2, tab3, tab4 = st.tabs(["🏟 Pitch View", "📈 Market Data", "🏆 Results", "🕶 VR Experience"])
 
 with tab1:
-    if st.session_state.game['active']:
+    if game.active:
         draw_pitch()
         
         # Match status
-        elapsed = datetime.now() - st.session_state.game['start_time']
-        remaining = max(180 - elapsed.seconds, 0)
-        st.progress(min(elapsed.seconds / 180, 1.0), 
-                   f"⏳ Match Time: {str(elapsed).split('.')[0]} | Snitch appears in: {max(120 - elapsed.seconds, 0)}s")
+        elapsed = datetime.now() - game.start_time
+        remaining = max(MATCH_SECONDS - elapsed.seconds, 0)
+        st.progress(min(elapsed.seconds / MATCH_SECONDS, 1.0), 
+                   f"⏳ Match Time: {str(elapsed).split('.')[0]} | Snitch appears in: {max(SNITCH_APPEARS - elapsed.seconds, 0)}s")
         
         # Magical events
-        new_events = simulate_events()
+        new_events = simulate_events() if advance else []
         if new_events:
-            st.session_state.game['events'].extend(new_events)
+            session_store.log_events(game, *new_events)
             for event in new_events:
                 st.markdown(f'<div class="bludger-alert">{event}</div>', unsafe_allow_html=True)
     else:
@@ -701,23 +680,17 @@ with tab1:
         """, unsafe_allow_html=True)
 
 with tab2:
-    if st.session_state.game['active']:
+    if game.active:
         # Update prices less frequently for performance
-        if time.time() % 5 < 0.5:  # Update every ~5 seconds
-            for house in HOUSES:
-                st.session_state.game['prices'][house].append(generate_price(house))
-                if len(st.session_state.game['prices'][house]) > 50:
-                    st.session_state.game['prices'][house].pop(0)
+        if advance and time.time() % 5 < 0.5:  # Update every ~5 seconds
+            game.push_prices(step_prices(game.last_prices(), HOUSE_VOLATILITY, rng))
             update_positions()
         
         draw_performance()
         
         # Current price table
         st.markdown("### Current Stock Values")
-        current_prices = {
-            house: st.session_state.game['prices'][house][-1]
-            for house in HOUSES
-        }
+        current_prices = dict(zip(HOUSE_NAMES, game.last_prices().tolist()))
         st.table(pd.DataFrame.from_dict(current_prices, orient='index', columns=['Price (Galleons)'])
                 .style.format("{:.2f}")
                 .background_gradient(axis=0))
@@ -725,13 +698,13 @@ with tab2:
         st.write("📊 Market data will appear during matches")
 
 with tab3:
-    if not st.session_state.game['active'] and st.session_state.game['start_time'] is not None:
+    if not game.active and game.start_time is not None:
         show_final_results()
     else:
         st.info("🏁 Complete a match to see detailed results and analysis")
 
 with tab4:
-    if st.session_state.game['vr_mode']:
+    if vr_mode:
         show_vr_mode()
     else:
         st.info("Enable VR Mode in the sidebar to experience the magical world in 3D!")
@@ -751,6 +724,6 @@ with tab4:
     """, unsafe_allow_html=True)
 
 # Run the match loop without threads
-if st.session_state.game['active']:
-    time.sleep(1)  # Prevent excessive reruns
+if game.active and AUTO_RERUN:
+    time.sleep(TICK_SECONDS)  # Prevent excessive reruns
     st.rerun()